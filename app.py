@@ -1,25 +1,187 @@
 import io
 import re
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, NamedTuple, Optional, Tuple, List
 
 import streamlit as st
 import pandas as pd
 
+import pdfium_text
+
+# RE2 (если установлен) сопоставляет за линейное время при любой форме
+# паттерна; API совпадает с re. Флаги задаём только внутри паттернов
+try:
+    import re2 as _re
+except ImportError:
+    import re as _re
+
+# Numba (необязательно) ускоряет сканер телефонов на больших пакетах.
+# Ядра лежат в отдельном модуле: Streamlit выполняет app.py заново на
+# каждом rerun, а импортированный модуль компилируется один раз на процесс
+from phone_scan_numba import HAVE_NUMBA as _HAVE_NUMBA
+if _HAVE_NUMBA:
+    from phone_scan_numba import scan_phone_spans as _scan_phone_spans_numba
+
+# Aho-Corasick (необязательно): все ключевые слова должностей за один проход
+try:
+    import ahocorasick
+    _HAVE_AHOCORASICK = True
+except ImportError:
+    _HAVE_AHOCORASICK = False
+
+# ---------- Compiled regexes ----------
+_RE_NON_DIGIT_PLUS = re.compile(r"[^\d+]")
+_RE_MULTI_PLUS = re.compile(r'\++')
+
+# Разделители внутри номера: не больше трёх подряд, чтобы длинные серии
+# пробелов/скобок не заставляли движок перебирать разбиения
+_PHONE_SEP = r'[\s\-().]{0,3}'
+_SEP_DIGIT = _PHONE_SEP + r'\d'
+
+# Телефоны в разных форматах
+_PHONE_RAW_PATTERNS = [
+    # +380XXXXXXXXX (с возможными разделителями, в т.ч. +38 (0XX))
+    r'\+\s?38' + _PHONE_SEP + '0' + _SEP_DIGIT * 9,
+    # 380XXXXXXXXX (без +)
+    r'\b38' + _PHONE_SEP + '0' + _SEP_DIGIT * 9,
+    # 0XXXXXXXXX (украинский формат)
+    r'\b0' + _SEP_DIGIT * 9,
+    # Любые 10 цифр подряд (с разделителями)
+    r'\b\d' + _SEP_DIGIT * 9,
+    # Просто 10 цифр подряд
+    r'\b\d{10}\b',
+    # 9 цифр (может не хватать первого 0)
+    r'\b\d{9}\b',
+]
+# Все форматы одним проходом по тексту
+_PHONE_UNION = _re.compile("|".join(f"(?:{p})" for p in _PHONE_RAW_PATTERNS))
+# Только украинские форматы (+380, 380, 0): ими перепроверяем совпадения
+# общих ветвей - иначе короткое число перед номером съедает его первые цифры
+_PHONE_UA = _re.compile("|".join(f"(?:{p})" for p in _PHONE_RAW_PATTERNS[:3]))
+
+# Телефоны ищем ручным сканером (_scan_phone_spans); regex-версия
+# (_union_phone_spans) оставлена для сверки результатов
+_USE_PHONE_SCANNER = True
+_PHONE_TRIGGERS = '0123456789+'
+_PHONE_SEP_CHARS = frozenset(' \t\n-().')
+
+# ФИО - ОЧЕНЬ гибкие паттерны
+_FIO_PATTERNS = [_re.compile(p) for p in [
+    # 3 слова с заглавной (Фамилия Имя Отчество)
+    r'([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{2,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{2,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{2,})',
+    # 2 слова с заглавной (Фамилия Имя) - минимум 2 буквы
+    r'([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{1,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{1,})',
+]]
+
+# Строки, где ФИО не ищем: email/URL, домены, даты дд.мм.гггг или год
+_FIO_REJECT = _re.compile(
+    r'@|https?://|www\.'
+    r'|\.(?:com|ru|ua|org|net|gov)'
+    r'|\b\d{2}\.\d{2}\.\d{4}\b|\b(?:199|200|201|202)\d\b'
+)
+_DROP_DIGITS = str.maketrans('', '', '0123456789')
+
+# Явное указание должности (ищем в PreparedText.head). Флаги внутри паттернов -
+# google-re2 не принимает их аргументом compile(). Что метка начинает слово,
+# проверяет _search_label: \b в начале паттерна отключает в re быстрый поиск
+# по литеральному префиксу, а в RE2 \b понимает только ASCII
+_POSITION_PATTERNS = [_re.compile(p) for p in [
+    r'(?im)(?:желаемая|бажана)\s+(?:должность|посада)[:\s\-—]*(.+?)$',
+    r'(?im)(?:должность|посада)[:\s\-—]+(.+?)$',
+    r'(?im)(?:вакансия|вакансія)[:\s\-—]+(.+?)$',
+    r'(?im)(?:розглядає|рассматривает)\s+(?:посади|должности)[:\s\-—]*(.+?)$',
+    r'(?im)(?:позиция|позиція)[:\s\-—]+(.+?)$',
+    r'(?im)position[:\s\-—]+(.+?)$',
+    r'(?im)objective[:\s\-—]+(.+?)$',
+    r'(?im)(?:цель|ціль)[:\s\-—]+(.+?)$',
+    r'(?im)(?:ищу|шукаю)\s+(?:работу|роботу)[:\s\-—]*(.+?)$',
+]]
+_RE_TRAILING_SEP = re.compile(r'[_\-—\.]+$')
+_RE_TRAILING_ID = re.compile(r'\s+\d{6,}$')
+_RE_POSITION_LINE_REJECT = _re.compile(r'(@|https?://|www\.|\d{4}|\.com|\.ua|\.ru)')
+_RE_CAPITALIZED_WORD = _re.compile(r'^[А-ЯЁA-Z][а-яёa-z]+$')
+_RE_TRAILING_PUNCT = re.compile(r'[,;:.]+$')
+
+# Очистка имени файла
+_RE_EXTENSION = re.compile(r"\.[^.]+$")
+_RE_ONLY_DIGITS = re.compile(r'^\d+$')
+_FILENAME_NOISE_PATTERNS: List[re.Pattern] = [re.compile(p) for p in [
+    r'(?i)workua', r'(?i)work\.ua', r'(?i)резюме', r'(?i)resume', r'(?i)\bcv\b',
+]]
+_RE_LONG_NUMBER = re.compile(r'\b\d{10,}\b')
+_RE_DATE_LIKE = re.compile(r'\d{2,4}[-./]\d{1,2}[-./]\d{2,4}')
+_RE_FILENAME_SEP = re.compile(r"[_\-—,\.]+")
+
+# Отладка: последовательности из 9+ цифр
+_RE_DIGIT_SEQUENCE = re.compile(r'\d' + _SEP_DIGIT * 8)
+
+# ---------- Keywords ----------
+# Минимальный список стоп-слов - только явные служебные слова
+_STOP_WORDS = frozenset([
+    'резюме', 'curriculum', 'vitae', 
+    'email', 'www', 'http', 'https',
+    'розглядає', 'рассматривает',
+    'январ', 'феврал', 'март', 'апрел', 'май', 'июн', 'июл', 'август', 'сентябр', 'октябр', 'ноябр', 'декабр',
+    'січня', 'лютого', 'березня', 'квітня', 'травня', 'червня', 'липня', 'серпня', 'вересня', 'жовтня', 'листопада', 'грудня',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
+    'понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье',
+    'понеділок', 'вівторок', 'середа', 'четвер', "п'ятниця", 'субота', 'неділя',
+    'university', 'університет', 'інститут', 'institute', 'академія', 'academy', 'школа', 'school',
+    'освіта', 'образование', 'education', 'досвід', 'опыт', 'experience'
+])
+# Строка начинается со стоп-слова (длинные слова проверяем первыми)
+_STOP_PREFIX_RE = _re.compile('|'.join(map(re.escape, sorted(_STOP_WORDS, key=len, reverse=True))))
+
+# Слова должностей - НЕ стоп-слова, ФИО может быть рядом
+_POSITION_WORDS = frozenset([
+    'менеджер', 'manager', 'адміністратор', 'administrator', 'продавець', 'продавец',
+    'консультант', 'спеціаліст', 'специалист', 'specialist', 'помічник', 'помощник',
+    'оператор', 'operator', 'директор', 'director', 'координатор', 'рекрутер', 'recruiter'
+])
+
+# Ключевые слова должностей для поиска без явной метки
+_POSITION_KEYWORDS_UK = [
+    'менеджер', 'адміністратор', 'продавець', 'консультант', 'спеціаліст',
+    'помічник', 'оператор', 'координатор', 'асистент', 'керівник',
+    'бариста', 'офіс-менеджер', 'секретар', 'рекрутер'
+]
+
+_POSITION_KEYWORDS_RU = [
+    'менеджер', 'администратор', 'продавец', 'консультант', 'специалист',
+    'помощник', 'оператор', 'координатор', 'ассистент', 'руководитель',
+    'бариста', 'офис-менеджер', 'секретарь', 'рекрутер'
+]
+
+_POSITION_KEYWORDS_EN = [
+    'manager', 'administrator', 'seller', 'consultant', 'specialist',
+    'assistant', 'operator', 'coordinator', 'director', 'supervisor',
+    'barista', 'recruiter', 'designer', 'developer', 'engineer'
+]
+
+_ALL_POSITION_KW = frozenset(_POSITION_KEYWORDS_UK + _POSITION_KEYWORDS_RU + _POSITION_KEYWORDS_EN)
+
+if _HAVE_AHOCORASICK:
+    _POS_AC = ahocorasick.Automaton()
+    for _kw in _ALL_POSITION_KW:
+        _POS_AC.add_word(_kw, _kw)
+    _POS_AC.make_automaton()
+
 # ---------- Helpers ----------
 def clean_phone(s: str) -> Optional[str]:
     """Очищает и валидирует номер телефона"""
     # Убираем все кроме цифр и +
-    digits = re.sub(r"[^\d+]", "", s)
+    digits = _RE_NON_DIGIT_PLUS.sub("", s)
     
     # Убираем множественные +
-    digits = re.sub(r'\++', '+', digits)
+    digits = _RE_MULTI_PLUS.sub('+', digits)
     
     # Убираем + не в начале
     if '+' in digits[1:]:
         digits = digits[0] + digits[1:].replace('+', '')
     
     # Получаем только цифры для проверки длины
-    core = re.sub(r"\D", "", digits)
+    # (после очистки выше там только цифры и '+')
+    core = digits.replace('+', '')
     
     # Украинские номера: 10 цифр (0XXXXXXXXX) или 12 цифр (+380XXXXXXXXX)
     if len(core) == 10 and core.startswith('0'):
@@ -34,81 +196,246 @@ def clean_phone(s: str) -> Optional[str]:
     return None
 
 
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _union_phone_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """Границы телефонов по _PHONE_UNION.
+
+    Если совпала общая ветвь (10 любых цифр), а внутри с начала слова
+    начинается номер 0XXXXXXXXX/380XXXXXXXXX, берём его.
+    """
+    pos = 0
+    while True:
+        m = _PHONE_UNION.search(text, pos)
+        if not m:
+            return
+        start, end = m.span()
+        if not _PHONE_UA.match(text, start):
+            for p in range(start + 1, end):
+                if text[p] in '03' and not _is_word_char(text[p - 1]):
+                    ua = _PHONE_UA.match(text, p)
+                    if ua:
+                        start, end = ua.span()
+                        break
+        yield start, end
+        pos = end
+
+
+def _collect_phone_digits(text: str, start: int) -> Tuple[int, int, str, int, int, int, int]:
+    """Собирает до 12 цифр от start, пропуская до трёх разделителей подряд.
+
+    Возвращает (число цифр, длина первой группы цифр, первые три цифры,
+    конец 10-й цифры, конец 12-й цифры, конец последней цифры, где остановились).
+    """
+    n = len(text)
+    count = first_group = sep_run = 0
+    prefix = ''
+    end10 = end12 = -1
+    j = last = start
+    while j < n:
+        ch = text[j]
+        if '0' <= ch <= '9':
+            count += 1
+            if count <= 3:
+                prefix += ch
+            if count == first_group + 1 and last == j:
+                first_group += 1
+            sep_run = 0
+            j += 1
+            last = j
+            if count == 10:
+                end10 = j
+            elif count == 12:
+                end12 = j
+                break
+        elif ch in _PHONE_SEP_CHARS and sep_run < 3:
+            sep_run += 1
+            j += 1
+        else:
+            break
+    return count, first_group, prefix, end10, end12, last, j
+
+
+def _ua_phone_end(text: str, start: int) -> int:
+    """Конец номера 380XXXXXXXXX или 0XXXXXXXXX, начинающегося в start, иначе -1"""
+    _, _, prefix, end10, end12, _, _ = _collect_phone_digits(text, start)
+    if end12 > 0 and prefix == '380' and text.startswith('38', start):
+        return end12
+    if end10 > 0 and text[start] == '0':
+        return end10
+    return -1
+
+
+def _scan_phone_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """Находит границы телефонов одним проходом, без regex.
+
+    Повторяет _union_phone_spans: +380/380 + 9 цифр, иначе любые 10 цифр
+    (между цифрами до трёх разделителей подряд) или ровно 9 цифр подряд.
+    """
+    n = len(text)
+    i = 0
+    # Ближайшее вхождение каждой цифры и '+': буквы пропускаем через str.find
+    nxt = {ch: text.find(ch) for ch in _PHONE_TRIGGERS}
+    while i < n:
+        for ch, pos in nxt.items():
+            if 0 <= pos < i:
+                nxt[ch] = text.find(ch, i)
+        found = [pos for pos in nxt.values() if pos >= 0]
+        if not found:
+            return
+        i = min(found)
+        
+        c = text[i]
+        if c == '+':
+            start = i + 1
+            if start < n and text[start] == ' ':
+                start += 1
+        elif i == 0 or not _is_word_char(text[i - 1]):
+            start = i
+        else:
+            i += 1
+            continue
+        if start >= n or not '0' <= text[start] <= '9':
+            i += 1
+            continue
+        
+        # Собираем цифры, пропуская разделители
+        count, first_group, prefix, end10, end12, last, j = _collect_phone_digits(text, start)
+        
+        if end12 > 0 and prefix == '380' and text.startswith('38', start):
+            yield (i if c == '+' else start), end12
+            i = end12
+        elif end10 > 0:
+            # Общая ветвь: ищем внутри украинский номер с начала слова
+            if text[start] != '0':
+                for p in range(start + 1, end10):
+                    if text[p] in '03' and not _is_word_char(text[p - 1]):
+                        ua_end = _ua_phone_end(text, p)
+                        if ua_end > 0:
+                            start, end10 = p, ua_end
+                            break
+            yield start, end10
+            i = end10
+        elif count == 9 and first_group == 9 and (last >= n or not _is_word_char(text[last])):
+            yield start, last
+            i = last
+        else:
+            i = max(j, i + 1)
+
+
+def iter_phones(text: str) -> Iterator[str]:
+    """Лениво перебирает телефоны в тексте со схлопнутыми пробелами
+    (PreparedText.flat) в порядке появления; повторы не убираются.
+    """
+    if _USE_PHONE_SCANNER and _HAVE_NUMBA:
+        raw_phones = (text[a:b] for a, b in _scan_phone_spans_numba(text))
+    elif _USE_PHONE_SCANNER:
+        raw_phones = (text[a:b] for a, b in _scan_phone_spans(text))
+    else:
+        raw_phones = (text[a:b] for a, b in _union_phone_spans(text))
+    
+    for phone_raw in raw_phones:
+        phone = clean_phone(phone_raw)
+        if not phone:
+            continue
+        
+        # Проверяем что это не дата или ID
+        # clean_phone оставляет только цифры и '+' в начале
+        digits_only = phone.lstrip('+')
+        
+        # Пропускаем если похоже на дату (начинается с 19, 20, 01-31)
+        if len(digits_only) == 8 and (digits_only.startswith('19') or digits_only.startswith('20')):
+            continue
+        
+        # Пропускаем если все цифры одинаковые
+        if len(set(digits_only)) == 1:
+            continue
+        
+        # Пропускаем ID документов (слишком длинные)
+        if len(digits_only) > 13:
+            continue
+        
+        yield phone
+
+
 def find_all_phones(text: str) -> List[str]:
-    """Находит все телефоны в тексте"""
+    """Находит все телефоны в тексте со схлопнутыми пробелами (PreparedText.flat)"""
     candidates = []
-    
-    # Убираем лишние пробелы
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Множество паттернов для разных форматов
-    patterns = [
-        # +380XXXXXXXXX (с возможными разделителями)
-        r'\+\s?380[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d',
-        # 380XXXXXXXXX (без +)
-        r'\b380[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d',
-        # 0XXXXXXXXX (украинский формат)
-        r'\b0[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d',
-        # Любые 10 цифр подряд (с разделителями)
-        r'\b\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d',
-        # Просто 10 цифр подряд
-        r'\b\d{10}\b',
-        # 9 цифр (может не хватать первого 0)
-        r'\b\d{9}\b',
-    ]
-    
-    for pattern in patterns:
-        for match in re.finditer(pattern, text):
-            phone_raw = match.group(0)
-            phone = clean_phone(phone_raw)
-            if phone and phone not in candidates:
-                # Проверяем что это не дата или ID
-                digits_only = re.sub(r'\D', '', phone)
-                
-                # Пропускаем если похоже на дату (начинается с 19, 20, 01-31)
-                if len(digits_only) == 8 and (digits_only.startswith('19') or digits_only.startswith('20')):
-                    continue
-                
-                # Пропускаем если все цифры одинаковые
-                if len(set(digits_only)) == 1:
-                    continue
-                
-                # Пропускаем ID документов (слишком длинные)
-                if len(digits_only) > 13:
-                    continue
-                
-                candidates.append(phone)
-    
+    seen = set()
+    for phone in iter_phones(text):
+        if phone not in seen:
+            seen.add(phone)
+            candidates.append(phone)
     return candidates
 
 
 def best_phone(text: str) -> Optional[str]:
-    """Возвращает первый найденный телефон"""
-    phones = find_all_phones(text)
-    
-    # Приоритет: сначала номера с +380 или начинающиеся с 0
-    priority_phones = [p for p in phones if p.startswith('+380') or p.startswith('0')]
-    if priority_phones:
-        return priority_phones[0]
-    
-    return phones[0] if phones else None
+    """Возвращает первый найденный телефон (text - PreparedText.flat)"""
+    fallback = None
+    for phone in iter_phones(text):
+        # Приоритет: номера с +380 или начинающиеся с 0 - дальше не ищем
+        if phone.startswith('+380') or phone.startswith('0'):
+            return phone
+        if fallback is None:
+            fallback = phone
+    return fallback
+
+
+def _collect_text(pages: Iterator[str], max_chars: int) -> str:
+    """Склеивает текст страниц, пока не наберётся max_chars символов"""
+    buf = io.StringIO()
+    total = 0
+    for t in pages:
+        if t:
+            if total:
+                buf.write("\n")
+            buf.write(t)
+            total += len(t)
+            # Для извлечения хватает начала документа
+            if total >= max_chars:
+                break
+    return buf.getvalue()
 
 
-def read_pdf(file_bytes: bytes) -> str:
+def _read_pdf_pdfium(file_bytes: bytes, max_chars: int, max_pages: int) -> str:
+    # Документ открыт под общей для процесса блокировкой PDFium (pdfium_text)
+    with pdfium_text.open_document(file_bytes) as pdf:
+        pages = (pdfium_text.page_text(pdf[i]) for i in range(min(len(pdf), max_pages)))
+        return _collect_text(pages, max_chars)
+
+
+def _pdfplumber_page_text(page) -> str:
+    try:
+        return page.extract_text() or ""
+    finally:
+        # Сразу освобождаем объекты раскладки страницы, а не в конце документа
+        page.flush_cache()
+
+
+def _read_pdf_pdfplumber(file_bytes: bytes, max_chars: int, max_pages: int) -> str:
     try:
         import pdfplumber
     except Exception:
         return ""
-    text_parts = []
     with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text() or ""
-            if t:
-                text_parts.append(t)
-    return "\n".join(text_parts)
+        pages = (_pdfplumber_page_text(page) for page in pdf.pages[:max_pages])
+        return _collect_text(pages, max_chars)
 
 
-def read_docx(file_bytes: bytes) -> str:
+def read_pdf(file_bytes: bytes, max_chars: int = 16384, max_pages: int = 10) -> str:
+    """Читает текст PDF, останавливаясь после max_pages страниц или max_chars символов"""
+    # PDFium отдаёт текст страницы сразу, без раскладки по символам, как
+    # pdfplumber; pdfplumber остаётся запасным вариантом
+    try:
+        return _read_pdf_pdfium(file_bytes, max_chars, max_pages)
+    except Exception:
+        return _read_pdf_pdfplumber(file_bytes, max_chars, max_pages)
+
+
+def read_docx(file_bytes: bytes, max_chars: int = 16384) -> str:
+    """Читает текст DOCX (абзацы, затем таблицы) до max_chars символов"""
     try:
         from docx import Document
     except Exception:
@@ -116,22 +443,36 @@ def read_docx(file_bytes: bytes) -> str:
     f = io.BytesIO(file_bytes)
     doc = Document(f)
     parts = []
+    total = 0
     for p in doc.paragraphs:
         txt = p.text.strip()
         if txt:
             parts.append(txt)
+            total += len(txt)
+            if total >= max_chars:
+                return "\n".join(parts)
     for table in doc.tables:
         for row in table.rows:
             for cell in row.cells:
                 t = cell.text.strip()
                 if t:
                     parts.append(t)
+                    total += len(t)
+                    if total >= max_chars:
+                        return "\n".join(parts)
     return "\n".join(parts)
 
 
-def read_file(uploaded_file) -> str:
-    data = uploaded_file.read()
-    name = uploaded_file.name.lower()
+def read_bytes(uploaded_file) -> bytes:
+    """Читает содержимое загруженного файла (только из основного потока)"""
+    # getvalue() не зависит от позиции курсора, поэтому повторные запуски
+    # скрипта получают те же байты и попадают в кэш process_bytes
+    return uploaded_file.getvalue()
+
+
+def parse_bytes(name: str, data: bytes) -> str:
+    """Извлекает текст из содержимого файла по его расширению"""
+    name = name.lower()
     if name.endswith(".pdf"):
         return read_pdf(data)
     if name.endswith(".docx"):
@@ -143,78 +484,85 @@ def read_file(uploaded_file) -> str:
 
 
 # ---------- Extraction from text ----------
-def extract_fio_from_text(text: str) -> Optional[str]:
-    """Извлекает ФИО из документа резюме"""
-    if not text:
-        return None
-    
-    # Убираем лишние пробелы и разбиваем на строки
-    text = re.sub(r'\s+', ' ', text)
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    
+class PreparedText(NamedTuple):
+    """Текст документа, разобранный один раз для всех извлекателей"""
+    lines: List[str]  # непустые строки со схлопнутыми пробелами
+    flat: str  # весь текст в одну строку - для поиска телефонов
+    head: str  # первые 4000 символов - для явного указания должности
+
+
+def _prepare(text: str) -> PreparedText:
+    lines = [' '.join(l.split()) for l in text.split('\n')]
+    return PreparedText(
+        lines=[l for l in lines if l],
+        flat=' '.join(text.split()),
+        head=text[:4000],
+    )
+
+
+def _fio_priority(idx: int, nword: int, avg_len: float, line_len: int, has_position: bool) -> int:
+    """Приоритет кандидата на ФИО"""
+    priority = 100 - idx  # Позиция в документе
+    
+    # Бонусы
+    if nword == 3:  # ФИО с отчеством
+        priority += 60
+    elif nword == 2:
+        # Смотрим на длину слов
+        if avg_len >= 5:  # Полные слова
+            priority += 40
+        elif avg_len >= 3:  # Средние/сокращенные
+            priority += 25
+        else:
+            priority += 10
+    
+    # Огромный бонус если в первых 3 строках
+    if idx < 3:
+        priority += 100
+    elif idx < 10:
+        priority += 50
+    
+    # Бонус если строка короткая (вероятно только ФИО)
+    if line_len < 60:
+        priority += 30
+    
+    # Штраф если есть должность в строке
+    if has_position:
+        priority -= 10
+    
+    return priority
+
+
+def extract_fio_from_prepared(lines: List[str]) -> Optional[str]:
+    """Извлекает ФИО из строк документа резюме (PreparedText.lines)"""
     # Ищем в первых 50 строках
     search_lines = lines[:50]
     
-    # Паттерны для поиска ФИО - ОЧЕНЬ гибкие
-    fio_patterns = [
-        # 3 слова с заглавной (Фамилия Имя Отчество)
-        r'([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{2,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{2,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{2,})',
-        # 2 слова с заглавной (Фамилия Имя) - минимум 2 буквы
-        r'([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{1,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{1,})',
-    ]
-    
-    # Минимальный список стоп-слов - только явные служебные слова
-    stop_words = [
-        'резюме', 'curriculum', 'vitae', 
-        'email', 'www', 'http', 'https',
-        'розглядає', 'рассматривает',
-        'январ', 'феврал', 'март', 'апрел', 'май', 'июн', 'июл', 'август', 'сентябр', 'октябр', 'ноябр', 'декабр',
-        'січня', 'лютого', 'березня', 'квітня', 'травня', 'червня', 'липня', 'серпня', 'вересня', 'жовтня', 'листопада', 'грудня',
-        'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
-        'понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье',
-        'понеділок', 'вівторок', 'середа', 'четвер', "п'ятниця", 'субота', 'неділя',
-        'university', 'університет', 'інститут', 'institute', 'академія', 'academy', 'школа', 'school',
-        'освіта', 'образование', 'education', 'досвід', 'опыт', 'experience'
-    ]
-    
-    # Слова должностей - НЕ стоп-слова, ФИО может быть рядом
-    position_words = [
-        'менеджер', 'manager', 'адміністратор', 'administrator', 'продавець', 'продавец',
-        'консультант', 'спеціаліст', 'специалист', 'specialist', 'помічник', 'помощник',
-        'оператор', 'operator', 'директор', 'director', 'координатор', 'рекрутер', 'recruiter'
-    ]
-    
     candidates = []
     
     for idx, line in enumerate(search_lines):
         line_lower = line.lower()
         
-        # Пропускаем только явно нерелевантные строки
-        # Email и URL
-        if re.search(r'@|https?://|www\.', line):
-            continue
-        
-        # Строки с доменами
-        if re.search(r'\.(com|ru|ua|org|net|gov)', line):
-            continue
-        
-        # Даты в формате дд.мм.гггг или просто год
-        if re.search(r'\b\d{2}\.\d{2}\.\d{4}\b|\b(199|200|201|202)\d\b', line):
+        # Пропускаем только явно нерелевантные строки:
+        # email, URL, домены, даты
+        if _FIO_REJECT.search(line):
             continue
         
         # Строки где больше 10 цифр (скорее всего номера/коды)
-        digit_count = sum(c.isdigit() for c in line)
+        digit_count = len(line) - len(line.translate(_DROP_DIGITS))
         if digit_count > 10:
             continue
         
+        has_position = any(pw in line_lower for pw in _POSITION_WORDS)
+        
         # Пропускаем если вся строка - это только стоп-слова
-        if any(line_lower.startswith(word) for word in stop_words):
-            if not any(pw in line_lower for pw in position_words):
+        if _STOP_PREFIX_RE.match(line_lower):
+            if not has_position:
                 continue
         
         # Ищем ФИО по паттернам
-        for pattern in fio_patterns:
-            matches = list(re.finditer(pattern, line))
+        for pattern in _FIO_PATTERNS:
+            matches = list(pattern.finditer(line))
             for match in matches:
                 fio = ' '.join(match.groups())
                 words = fio.split()
@@ -224,111 +572,59 @@ def extract_fio_from_text(text: str) -> Optional[str]:
                     continue
                 
                 # Проверяем что слова не стоп-слова
-                if any(word.lower() in stop_words for word in words):
+                if not _STOP_WORDS.isdisjoint(w.lower() for w in words):
                     continue
                 
                 # Пропускаем если все слова - названия должностей
-                if all(word.lower() in position_words for word in words):
+                if all(w.lower() in _POSITION_WORDS for w in words):
                     continue
                 
-                # Считаем приоритет
-                priority = 100 - idx  # Позиция в документе
-                
-                # Бонусы
-                if len(words) == 3:  # ФИО с отчеством
-                    priority += 60
-                elif len(words) == 2:
-                    # Смотрим на длину слов
-                    avg_len = sum(len(w) for w in words) / len(words)
-                    if avg_len >= 5:  # Полные слова
-                        priority += 40
-                    elif avg_len >= 3:  # Средние/сокращенные
-                        priority += 25
-                    else:
-                        priority += 10
-                
-                # Огромный бонус если в первых 3 строках
-                if idx < 3:
-                    priority += 100
-                elif idx < 10:
-                    priority += 50
-                
-                # Бонус если строка короткая (вероятно только ФИО)
-                if len(line) < 60:
-                    priority += 30
-                
-                # Штраф если есть должность в строке
-                if any(pw in line_lower for pw in position_words):
-                    priority -= 10
-                
-                candidates.append((priority, fio, idx, line))
+                avg_len = sum(len(w) for w in words) / len(words)
+                priority = _fio_priority(idx, len(words), avg_len, len(line), has_position)
+                candidates.append((priority, fio))
     
-    # Выбираем лучшего кандидата
+    # Выбираем лучшего кандидата (при равенстве - первого найденного)
     if candidates:
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        # Возвращаем топ кандидата
-        best = candidates[0]
-        return best[1]
+        return max(candidates, key=lambda x: x[0])[1]
     
     return None
 
 
-def extract_position_from_text(text: str) -> Optional[str]:
-    """Извлекает желаемую должность из резюме"""
-    if not text:
-        return None
-    
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    
-    # Паттерны для явного указания должности
-    position_patterns = [
-        r'(?i)(?:желаемая|бажана)\s+(?:должность|посада)[:\s\-—]*(.+?)(?:\n|$)',
-        r'(?i)(?:должность|посада)[:\s\-—]+(.+?)(?:\n|$)',
-        r'(?i)(?:вакансия|вакансія)[:\s\-—]+(.+?)(?:\n|$)',
-        r'(?i)(?:розглядає|рассматривает)\s+(?:посади|должности)[:\s\-—]*(.+?)(?:\n|$)',
-        r'(?i)(?:позиция|позиція)[:\s\-—]+(.+?)(?:\n|$)',
-        r'(?i)position[:\s\-—]+(.+?)(?:\n|$)',
-        r'(?i)objective[:\s\-—]+(.+?)(?:\n|$)',
-        r'(?i)(?:цель|ціль)[:\s\-—]+(.+?)(?:\n|$)',
-        r'(?i)(?:ищу|шукаю)\s+(?:работу|роботу)[:\s\-—]*(.+?)(?:\n|$)',
-    ]
-    
-    # Ищем по всему тексту
-    for pattern in position_patterns:
-        match = re.search(pattern, text[:4000])
+def _has_position_keyword(s: str) -> bool:
+    """Есть ли в строке (в нижнем регистре) ключевое слово должности"""
+    if _HAVE_AHOCORASICK:
+        return next(_POS_AC.iter(s), None) is not None
+    return any(kw in s for kw in _ALL_POSITION_KW)
+
+
+def _search_label(pattern, text: str):
+    """pattern.search, пропускающий метки внутри слова ("Composition:" - не "position:")"""
+    pos = 0
+    while True:
+        match = pattern.search(text, pos)
+        if match is None or match.start() == 0 or not _is_word_char(text[match.start() - 1]):
+            return match
+        pos = match.start() + 1
+
+
+def extract_position_from_prepared(lines: List[str], head: str) -> Optional[str]:
+    """Извлекает желаемую должность из резюме (PreparedText.lines и .head)"""
+    # Ищем в начале текста
+    for pattern in _POSITION_PATTERNS:
+        match = _search_label(pattern, head)
         if match:
             position = match.group(1).strip()
             # Очистка
-            position = re.sub(r'[_\-—\.]+$', '', position).strip()
+            position = _RE_TRAILING_SEP.sub('', position).strip()
             position = position.split('\n')[0].strip()
             
             # Убираем ID и номера в конце
-            position = re.sub(r'\s+\d{6,}$', '', position)
+            position = _RE_TRAILING_ID.sub('', position)
             
             if 3 <= len(position) <= 200:
                 return position
     
     # Если не нашли явное указание, ищем в первых 40 строках
-    position_keywords_uk = [
-        'менеджер', 'адміністратор', 'продавець', 'консультант', 'спеціаліст',
-        'помічник', 'оператор', 'координатор', 'асистент', 'керівник',
-        'бариста', 'офіс-менеджер', 'секретар', 'рекрутер'
-    ]
-    
-    position_keywords_ru = [
-        'менеджер', 'администратор', 'продавец', 'консультант', 'специалист',
-        'помощник', 'оператор', 'координатор', 'ассистент', 'руководитель',
-        'бариста', 'офис-менеджер', 'секретарь', 'рекрутер'
-    ]
-    
-    position_keywords_en = [
-        'manager', 'administrator', 'seller', 'consultant', 'specialist',
-        'assistant', 'operator', 'coordinator', 'director', 'supervisor',
-        'barista', 'recruiter', 'designer', 'developer', 'engineer'
-    ]
-    
-    all_keywords = position_keywords_uk + position_keywords_ru + position_keywords_en
-    
     for i, line in enumerate(lines[:40]):
         line_lower = line.lower()
         
@@ -337,16 +633,16 @@ def extract_position_from_text(text: str) -> Optional[str]:
             continue
         
         # Пропускаем с email, url, датами
-        if re.search(r'(@|https?://|www\.|\d{4}|\.com|\.ua|\.ru)', line):
+        if _RE_POSITION_LINE_REJECT.search(line):
             continue
         
         # Ищем ключевые слова должностей
-        if any(keyword in line_lower for keyword in all_keywords):
+        if _has_position_keyword(line_lower):
             # Убираем ФИО из строки если есть
             cleaned = line
             
             # Убираем ID номера
-            cleaned = re.sub(r'\s+\d{6,}$', '', cleaned)
+            cleaned = _RE_TRAILING_ID.sub('', cleaned)
             
             # Если в строке есть слова с заглавной буквы и должность, пытаемся разделить
             words = cleaned.split()
@@ -355,17 +651,17 @@ def extract_position_from_text(text: str) -> Optional[str]:
             for word in words:
                 word_lower = word.lower()
                 # Если слово похоже на должность
-                if any(kw in word_lower for kw in all_keywords):
+                if _has_position_keyword(word_lower):
                     position_words.append(word)
                 # Или если слово уже добавлено и текущее может быть частью должности
-                elif position_words and not re.match(r'^[А-ЯЁA-Z][а-яёa-z]+$', word):
+                elif position_words and not _RE_CAPITALIZED_WORD.match(word):
                     position_words.append(word)
                 elif position_words:
                     position_words.append(word)
             
             if position_words:
                 position = ' '.join(position_words).strip()
-                position = re.sub(r'[,;:.]+$', '', position)
+                position = _RE_TRAILING_PUNCT.sub('', position)
                 
                 # Финальная проверка длины
                 if 5 <= len(position) <= 150:
@@ -380,10 +676,10 @@ def extract_position_from_text(text: str) -> Optional[str]:
 
 def extract_position_from_filename(filename: str) -> str:
     """Извлекает должность из имени файла"""
-    name_clean = re.sub(r"\.[^.]+$", "", filename)
+    name_clean = _RE_EXTENSION.sub("", filename)
     
     # Если только цифры - возвращаем "—"
-    if re.match(r'^\d+$', name_clean):
+    if _RE_ONLY_DIGITS.match(name_clean):
         return "—"
     
     try:
@@ -393,17 +689,39 @@ def extract_position_from_filename(filename: str) -> str:
         pass
     
     # Очистка
-    for pattern in [r'(?i)workua', r'(?i)work\.ua', r'(?i)резюме', r'(?i)resume', r'(?i)\bcv\b']:
-        name_clean = re.sub(pattern, ' ', name_clean)
+    for pattern in _FILENAME_NOISE_PATTERNS:
+        name_clean = pattern.sub(' ', name_clean)
     
-    name_clean = re.sub(r'\b\d{10,}\b', ' ', name_clean)
-    name_clean = re.sub(r'\d{2,4}[-./]\d{1,2}[-./]\d{2,4}', ' ', name_clean)
-    name_clean = re.sub(r"[_\-—,\.]+", " ", name_clean)
-    name_clean = re.sub(r'\s+', ' ', name_clean).strip()
+    name_clean = _RE_LONG_NUMBER.sub(' ', name_clean)
+    name_clean = _RE_DATE_LIKE.sub(' ', name_clean)
+    name_clean = _RE_FILENAME_SEP.sub(" ", name_clean)
+    name_clean = ' '.join(name_clean.split())
     
     return name_clean if name_clean else "—"
 
 
+# ---------- Pipeline ----------
+@st.cache_data(show_spinner=False, max_entries=256)
+def process_bytes(data: bytes, name: str) -> dict:
+    """Разбирает один файл и извлекает из него ФИО, должность и телефон.
+
+    Результат кэшируется по содержимому файла: переключение настроек или
+    повторная загрузка тех же резюме не требует повторного разбора.
+    """
+    text = parse_bytes(name, data)
+    prepared = _prepare(text)
+    return {
+        "text": text,
+        # Для режима отладки, чтобы не разбирать текст повторно
+        "lines": prepared.lines,
+        "flat": prepared.flat,
+        "fio": extract_fio_from_prepared(prepared.lines) or "—",
+        "position_text": extract_position_from_prepared(prepared.lines, prepared.head),
+        "position_filename": extract_position_from_filename(name),
+        "phone": best_phone(prepared.flat) or "—",
+    }
+
+
 # ---------- UI ----------
 st.set_page_config(page_title="CV Extractor", page_icon="📄", layout="centered")
 st.title("📄 Екстрактор даних з резюме")
@@ -424,15 +742,21 @@ if uploaded:
     stats = {'fio_found': 0, 'position_found': 0, 'phone_found': 0, 'total': len(uploaded)}
     
     with st.spinner(f'Обробка {len(uploaded)} файлів...'):
-        for uf in uploaded:
-            text = read_file(uf)
+        # UploadedFile не потокобезопасен - читаем байты в основном потоке,
+        # а разбор PDF/DOCX и извлечение распределяем по потокам
+        files = [(read_bytes(uf), uf.name) for uf in uploaded]
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as ex:
+            results = list(ex.map(lambda f: process_bytes(*f), files))
+        
+        for (_, name), res in zip(files, results):
+            text = res["text"]
             
             # Извлечение данных
-            fio = extract_fio_from_text(text) or "—"
-            position_text = extract_position_from_text(text)
-            position_filename = extract_position_from_filename(uf.name)
+            fio = res["fio"]
+            position_text = res["position_text"]
+            position_filename = res["position_filename"]
             position = position_text if position_text else position_filename
-            phone = best_phone(text) or "—"
+            phone = res["phone"]
             
             # Статистика
             if fio != "—":
@@ -443,36 +767,40 @@ if uploaded:
                 stats['phone_found'] += 1
             
             rows.append({
-                "Файл": uf.name,
+                "Файл": name,
                 "ПІБ": fio,
                 "Бажана посада": position,
                 "Телефон": phone,
             })
             
             if debug_mode:
-                all_phones = find_all_phones(text)
+                all_phones = find_all_phones(res["flat"])
                 
                 # Находим всех кандидатов на ФИО для отладки
                 fio_candidates = []
-                lines_preview = [l.strip() for l in text.split('\n') if l.strip()][:50]
+                seen_candidates = set()
+                lines_preview = res["lines"][:50]
                 
                 for idx, line in enumerate(lines_preview):
                     # Простой поиск всех слов с заглавной
-                    pattern = r'([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{1,})\s+([А-ЯЁІЇЄҐA-Z][а-яёіїєґa-z]{1,})'
-                    matches = re.finditer(pattern, line)
+                    matches = _FIO_PATTERNS[1].finditer(line)
                     for match in matches:
                         candidate = ' '.join(match.groups())
+                        # Показываем каждого кандидата один раз - по первой строке
+                        if candidate in seen_candidates:
+                            continue
+                        seen_candidates.add(candidate)
                         fio_candidates.append(f"Строка {idx+1}: {candidate} | Вся строка: {line[:80]}")
                 
                 # Анализ текста на наличие последовательностей цифр
                 digit_sequences = []
                 # Ищем любые последовательности из 9-12 цифр
-                for match in re.finditer(r'\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d[\s\-\(\)\.]*\d', text[:2000]):
+                for match in _RE_DIGIT_SEQUENCE.finditer(text[:2000]):
                     seq = match.group(0)
                     digit_sequences.append(seq)
                 
                 debug_info.append({
-                    "Файл": uf.name,
+                    "Файл": name,
                     "ПІБ (результат)": fio,
                     "Посада (з тексту)": position_text or "—",
                     "Посада (з назви)": position_filename,
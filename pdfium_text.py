@@ -0,0 +1,37 @@
+"""Доступ к PDFium (pypdfium2) под общей блокировкой.
+
+PDFium не потокобезопасен: его нельзя вызывать из разных потоков
+одновременно, даже для разных документов. Streamlit выполняет app.py
+заново для каждого запуска каждой сессии, поэтому блокировка живёт здесь -
+импортированный модуль один на процесс, и блокировка тоже одна.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+_PDFIUM_LOCK = threading.Lock()
+
+
+@contextmanager
+def open_document(file_bytes: bytes) -> Iterator:
+    """Открывает PDF и держит блокировку PDFium до закрытия документа.
+
+    Все обращения к документу и его страницам - только внутри with.
+    """
+    import pypdfium2 as pdfium
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_bytes)
+        try:
+            yield pdf
+        finally:
+            pdf.close()
+
+
+def page_text(page) -> str:
+    textpage = page.get_textpage()
+    try:
+        # PDFium разделяет строки через \r\n
+        return textpage.get_text_range().replace("\r\n", "\n")
+    finally:
+        textpage.close()
+        page.close()
@@ -0,0 +1,147 @@
+"""Сканер телефонов на Numba (необязательная зависимость).
+
+Вынесен из app.py: Streamlit выполняет скрипт заново на каждом rerun, а
+импортированный модуль остаётся в sys.modules, поэтому ядра компилируются
+один раз на процесс, даже когда кэш Numba на диске недоступен.
+"""
+from typing import Iterator, Tuple
+
+import numpy as np
+
+try:
+    import numba
+    HAVE_NUMBA = True
+except Exception:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    # Символы BMP, которые regex считает частью слова (\w) - для проверки \b
+    _WORD_TABLE = np.array([chr(c).isalnum() or c == 95 for c in range(0x10000)], dtype=np.bool_)
+
+    def _jit(fn):
+        try:
+            return numba.njit(cache=True)(fn)
+        except RuntimeError:
+            # Кэшу некуда писать (например, в сборке PyInstaller)
+            return numba.njit(fn)
+
+    @_jit
+    def _nb_is_word(cp, word_table):
+        return cp < 0x10000 and word_table[cp]
+
+    @_jit
+    def _nb_is_sep(cp):
+        # ' ', '\t', '\n', '-', '(', ')', '.'
+        return cp == 32 or cp == 9 or cp == 10 or cp == 45 or cp == 40 or cp == 41 or cp == 46
+
+    @_jit
+    def _nb_collect_digits(cps, start):
+        """Как app._collect_phone_digits: первые три цифры - числом"""
+        n = cps.shape[0]
+        count = 0
+        first_group = 0
+        sep_run = 0
+        prefix = 0
+        end10 = -1
+        end12 = -1
+        j = start
+        last = start
+        while j < n:
+            ch = cps[j]
+            if 48 <= ch <= 57:
+                count += 1
+                if count <= 3:
+                    prefix = prefix * 10 + (ch - 48)
+                if count == first_group + 1 and last == j:
+                    first_group += 1
+                sep_run = 0
+                j += 1
+                last = j
+                if count == 10:
+                    end10 = j
+                elif count == 12:
+                    end12 = j
+                    break
+            elif _nb_is_sep(ch) and sep_run < 3:
+                sep_run += 1
+                j += 1
+            else:
+                break
+        return count, first_group, prefix, end10, end12, last, j
+
+    @_jit
+    def _nb_ua_phone_end(cps, start):
+        """Как app._ua_phone_end: конец номера 380/0 от start, иначе -1"""
+        count, first_group, prefix, end10, end12, last, j = _nb_collect_digits(cps, start)
+        if end12 > 0 and prefix == 380 and first_group >= 2:
+            return end12
+        if end10 > 0 and cps[start] == 48:
+            return end10
+        return -1
+
+    @_jit
+    def _nb_scan_phones(cps, word_table, i, out_start, out_end):
+        """Та же логика, что в app._scan_phone_spans, над массивом кодов символов.
+
+        Заполняет out_start/out_end и возвращает (число найденных, позиция
+        для продолжения) - буфер может закончиться раньше текста.
+        """
+        n = cps.shape[0]
+        found = 0
+        while i < n and found < out_start.shape[0]:
+            c = cps[i]
+            if c == 43:  # '+'
+                start = i + 1
+                if start < n and cps[start] == 32:
+                    start += 1
+            elif 48 <= c <= 57 and (i == 0 or not _nb_is_word(cps[i - 1], word_table)):
+                start = i
+            else:
+                i += 1
+                continue
+            if start >= n or not (48 <= cps[start] <= 57):
+                i += 1
+                continue
+
+            count, first_group, prefix, end10, end12, last, j = _nb_collect_digits(cps, start)
+
+            if end12 > 0 and prefix == 380 and first_group >= 2:
+                out_start[found] = i if c == 43 else start
+                out_end[found] = end12
+                found += 1
+                i = end12
+            elif end10 > 0:
+                # Общая ветвь: ищем внутри украинский номер с начала слова
+                if cps[start] != 48:
+                    for p in range(start + 1, end10):
+                        if (cps[p] == 48 or cps[p] == 51) and not _nb_is_word(cps[p - 1], word_table):
+                            ua_end = _nb_ua_phone_end(cps, p)
+                            if ua_end > 0:
+                                start = p
+                                end10 = ua_end
+                                break
+                out_start[found] = start
+                out_end[found] = end10
+                found += 1
+                i = end10
+            elif count == 9 and first_group == 9 and (last >= n or not _nb_is_word(cps[last], word_table)):
+                out_start[found] = start
+                out_end[found] = last
+                found += 1
+                i = last
+            else:
+                i = max(j, i + 1)
+        return found, i
+
+    def scan_phone_spans(text: str) -> Iterator[Tuple[int, int]]:
+        """Обёртка над _nb_scan_phones: индексы совпадают с индексами строки"""
+        # UTF-32: один элемент массива на символ строки
+        cps = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        out_start = np.empty(64, np.int64)
+        out_end = np.empty(64, np.int64)
+        i = 0
+        while i < len(cps):
+            found, i = _nb_scan_phones(cps, _WORD_TABLE, i, out_start, out_end)
+            for k in range(found):
+                yield int(out_start[k]), int(out_end[k])